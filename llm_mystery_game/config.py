@@ -0,0 +1,34 @@
+# Level / scoring configuration shared by the Streamlit app and the leaderboard backend
+
+# Q/A rounds per level — now STATIC: 3 rounds for all levels
+DEFAULT_ROUNDS = {
+    "level1": 3,
+    "level2": 3,
+    "level3": 3,
+    "level4": 3,
+    "level5": 3,
+}
+
+# Points per level
+POINTS = {
+    "level1": 20,
+    "level2": 30,
+    "level3": 50,
+    "level4": 70,
+    "level5": 100,
+}
+BONUS_ALL_WINS = 100
+
+# One bit per level for win tracking; all of them must be set for the one-time bonus
+LEVEL_BITS = {level: 1 << i for i, level in enumerate(POINTS)}  # level1 -> 1, level2 -> 2, level3 -> 4, ...
+ALL_LEVELS_MASK = (1 << len(LEVEL_BITS)) - 1
+
+# Map UI levels to the detective's internal difficulty buckets
+# (level4 and level5 are stricter/harder than level3)
+DIFF_FOR_AGENT = {
+    "level1": "easy",
+    "level2": "medium",
+    "level3": "hard",
+    "level4": "very_hard",
+    "level5": "extreme",
+}
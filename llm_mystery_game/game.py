@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, Iterator, List, Sequence, Tuple
+import asyncio
+import contextlib
+import functools
 import re
 
-from llm_client import LLMClient
+from guardrail import InjectionClassifier, sanitize
+from llm_client import CachedLLMClient, LLMClient
 from agents import (
+    FIXED_OUTCOME,
     CaseFacts,
+    FusedAnalyst,
+    count_clue_links,
     RogueAgent,
-    ClueMasterAgent,
-    HistorianAgent,
+    ObjectiveReportsAgent,
     LeadDetectiveAgent,
+    ReportBundle,
+    Transcript,
 )
 
 # ====== Utility parsing ======
@@ -30,16 +38,23 @@ def normalize_name(name: str | None) -> str:
     return name.strip().rstrip(".!?:;").strip().lower()
 
 
-def enforce_valid_final_name(llm: LLMClient, facts: CaseFacts, final_report: str) -> str:
+def enforce_valid_final_name(
+    llm: LLMClient,
+    facts: CaseFacts,
+    final_report: str,
+    accusation_re: "re.Pattern[str] | None" = None,
+) -> str:
     """
     Ensure the detective's final output is one of the allowed suspects.
+    Returns the lower-cased suspect name, or "" if even the validator fails.
+    `accusation_re` comes from LeadDetectiveAgent.compile_accusation_re (built here if omitted).
     """
-    final_raw = parse_final_accusation(final_report)
-    final_norm = normalize_name(final_raw)
-    allowed = {s.lower(): s for s in facts.suspects}
+    if accusation_re is None:
+        accusation_re = LeadDetectiveAgent.compile_accusation_re(facts.suspects)
 
-    if final_norm in allowed:
-        return final_norm
+    m = accusation_re.search(final_report or "")
+    if m:
+        return m.group("name").lower()
 
     system = (
         "You are a strict validator for a whodunit game. "
@@ -49,48 +64,50 @@ def enforce_valid_final_name(llm: LLMClient, facts: CaseFacts, final_report: str
     user = (
         "The detective previously wrote:\n"
         "<<<\n" + (final_report or "").strip() + "\n>>>\n\n"
-        f"Allowed suspects: {', '.join(facts.suspects)}\n"
+        f"Allowed suspects: {facts.suspects_csv}\n"
         "Output exactly one line, no explanation, no extra text."
     )
     fixed = llm.chat(system=system, user=user)
-    fixed_name = normalize_name(parse_final_accusation(fixed))
-    return fixed_name if fixed_name in allowed else ""
+    m = accusation_re.search(fixed)
+    return m.group("name").lower() if m else ""
 
 
 # ====== Scenario (balanced, concise 5+5+5) ======
 
+@functools.lru_cache(maxsize=None)
 def default_case() -> CaseFacts:
     """
     Balanced facts: 5 timeline events, 5 concise clues, 5 concise background items.
+    Built once: CaseFacts is frozen, so every game (and the app) shares the same instance.
     """
     setting = "Blackwood Manor during a thunderstorm, Saturday 8–11 PM"
     victim = "Lord Edmund Blackwood (found in the study at 10:45 PM)"
-    suspects = ["Butler", "Housekeeper", "Gardener", "Chef"]
+    suspects = ("Butler", "Housekeeper", "Gardener", "Chef")
     real_culprit = "Unknown"
 
-    timeline = [
+    timeline = (
         "8:00 PM – Dinner begins in the great hall.",
         "9:00 PM – Power flickers; staff check fuse boxes.",
         "9:45 PM – Butler seen near the study corridor.",
         "10:15 PM – Raised voices reported in the kitchen.",
         "10:45 PM – Lord Blackwood found dead in the study.",
-    ]
+    )
 
-    clues = [
+    clues = (
         "Muddy shoe print below the study window.",
         "Torn dark fabric on the study desk latch.",
         "Footprints from conservatory to study.",
         "Letter opener's sheath missing from display.",
         "Master key ring checked out at 10:20 PM (signature smudged).",
-    ]
+    )
 
-    context = [
+    context = (
         "Butler warned about overspending on wine cellar.",
         "Housekeeper blamed for a missing ledger page.",
         "Gardener denied request for tools and raise.",
         "Chef argued with victim over ruined dish.",
         "All staff had routine access near the study.",
-    ]
+    )
 
     return CaseFacts(
         setting=setting,
@@ -105,77 +122,260 @@ def default_case() -> CaseFacts:
 
 # ====== Game orchestration (multi-round) ======
 
-def run_game(
+async def _gather_opening(
+    reporter: ObjectiveReportsAgent,
+    witness: RogueAgent,
+    facts: CaseFacts,
     player_instruction: str,
-    rogue_role: str,
-    model_name: str | None = None,
-    rounds: int = 2,
-    difficulty: str = "medium",
-    seed: int | None = None,  # <-- NEW: deterministic seed for the whole run
-) -> Dict[str, str | List[Dict[str, str]]]:
+) -> Tuple[ReportBundle, str]:
     """
-    Multi-round investigation (API-only).
-      1) Clue Master + Historian initial reports
-      2) Witness (player-influenced Rogue) initial testimony
-      3) R rounds of Detective<->Witness Q/A
-      4) Detective conclusion (must be one of suspects)
+    The reports and the initial testimony are independent of each other,
+    so issue them concurrently: latency is the slowest call, not the sum.
     """
-    facts = default_case()
+    reports, witness_initial = await asyncio.gather(
+        reporter.areport_both(facts),
+        witness.atestify(facts, player_instruction=player_instruction),
+    )
+    return reports, witness_initial
 
-    # Deterministic client: greedy decoding + optional seed
-    llm = LLMClient(
-        model_name=model_name,
-        temperature=0.0,
-        top_p=1.0,
-        max_tokens=500,
-        seed=seed,
+
+async def run_round(
+    detective: LeadDetectiveAgent,
+    witnesses: Sequence[RogueAgent],
+    facts: CaseFacts,
+    transcript: Transcript,
+    player_instruction: str,
+) -> Dict[str, str]:
+    """
+    One Detective<->Witness round. The question goes to every witness at once and
+    their answers are gathered concurrently; with several witnesses each answer is
+    labelled with the witness role. Returns the new transcript entry.
+    """
+    question = await detective.aask_rogue_question(facts, transcript)
+    answers = await asyncio.gather(
+        *(w.aanswer_question(facts, question, player_instruction=player_instruction) for w in witnesses)
     )
+    if len(witnesses) == 1:
+        answer = answers[0]
+    else:
+        answer = "\n".join(f"[{w.role_name}] {a}" for w, a in zip(witnesses, answers))
+    return transcript.add(question, answer)
+
+
+def _similar(a: str, b: str, threshold: float = 0.7) -> bool:
+    """Word-set Jaccard similarity: cheap check that two answers say about the same thing."""
+    wa, wb = set(a.lower().split()), set(b.lower().split())
+    if not wa and not wb:
+        return True
+    return len(wa & wb) / len(wa | wb) >= threshold
 
-    # Agents
-    witness = RogueAgent(llm, role_name=rogue_role)  # presented as 'Witness' to the Detective
-    clue_master = ClueMasterAgent(llm)
-    historian = HistorianAgent(llm)
-    detective = LeadDetectiveAgent(llm)
 
-    # Initial reports & testimony
-    clue_report = clue_master.report(facts)
-    history_report = historian.report(facts)
-    witness_initial = witness.testify(facts, player_instruction=player_instruction)
+def _needs_refresh(answer: str) -> bool:
+    """An answer that ties the Butler to a dossier clue changes what the detective should ask next."""
+    return count_clue_links([answer]) > 0
 
-    # Conversation rounds
-    transcript: List[Dict[str, str]] = []
-    rounds = max(0, min(int(rounds), 6))  # bounds 0..6
 
-    # FIXED: respect the 'rounds' value
-    for r in range(1, rounds + 1):
-        question = detective.ask_rogue_question(facts, transcript)
-        answer = witness.answer_question(facts, question, player_instruction=player_instruction)
-        transcript.append({"round": r, "question": question, "answer": answer})
+async def _abort(task: asyncio.Task | None) -> None:
+    """Cancel `task` if it is still running and wait until its request is torn down."""
+    if task is not None and not task.done():
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
 
-    reports = {"Clue Master": clue_report, "Historian": history_report}
 
-    # Final conclusion
-    final_report = detective.conclude(
-        facts, reports, witness_initial, transcript, difficulty=difficulty
+async def _interview_speculative(
+    detective: LeadDetectiveAgent,
+    witness: RogueAgent,
+    facts: CaseFacts,
+    transcript: Transcript,
+    player_instruction: str,
+    rounds: int,
+) -> None:
+    """
+    Q/A rounds with the next question drafted while the witness is still answering.
+    The draft assumes the witness repeats their previous answer (player instructions
+    often force near-identical answers); it is kept when the real answer is similar and
+    adds no new Butler-to-clue link (see `_needs_refresh`), otherwise cancelled and the question is asked again from the real transcript.
+    """
+    question = await detective.aask_rogue_question(facts, transcript)
+    previous = None
+    for r in range(rounds):
+        answering = asyncio.create_task(
+            witness.aanswer_question(facts, question, player_instruction=player_instruction)
+        )
+        draft = None
+        try:
+            if previous is not None and r + 1 < rounds:
+                guess = transcript.fork()
+                guess.add(question, previous)
+                draft = asyncio.create_task(detective.aask_rogue_question(facts, guess))
+
+            answer = await answering
+            transcript.add(question, answer)
+            if r + 1 < rounds:
+                if draft is not None and _similar(previous, answer) and not _needs_refresh(answer):
+                    question = await draft
+                else:
+                    await _abort(draft)  # stale draft: stop its request before asking again
+                    question = await detective.aask_rogue_question(facts, transcript)
+        finally:
+            # The round failed: never leave a task running on its own
+            await _abort(answering)
+            await _abort(draft)
+        previous = answer
+
+
+async def _investigate(
+    reporter: ObjectiveReportsAgent | None,
+    witness: RogueAgent,
+    detective: LeadDetectiveAgent,
+    facts: CaseFacts,
+    transcript: Transcript,
+    player_instruction: str,
+    rounds: int,
+    speculate: bool = False,
+) -> Tuple[ReportBundle | None, str]:
+    """
+    Opening + Q/A rounds.
+    Without a `reporter` (fused mode) only the testimony is gathered and reports are None.
+    Each question depends on the previous answers, so rounds stay sequential
+    (unless `speculate` drafts the next question during the answer).
+    """
+    if reporter is None:
+        reports, witness_initial = None, await witness.atestify(facts, player_instruction=player_instruction)
+    else:
+        reports, witness_initial = await _gather_opening(reporter, witness, facts, player_instruction)
+    if speculate:
+        await _interview_speculative(detective, witness, facts, transcript, player_instruction, rounds)
+    else:
+        for _ in range(rounds):
+            await run_round(detective, [witness], facts, transcript, player_instruction)
+    return reports, witness_initial
+
+
+async def conclude_sweep(
+    detective: LeadDetectiveAgent,
+    cases: Sequence[Tuple[CaseFacts, ReportBundle, str, Transcript, str]],
+    max_concurrency: int = 8,
+) -> List[str]:
+    """
+    Conclude many independent games concurrently (difficulty tuning, instruction sweeps).
+    `cases` holds (facts, reports, witness_testimony, transcript, difficulty) tuples.
+    Calls start shortest expected reply first, at most `max_concurrency` at a time, so
+    short conclusions are not queued behind long ones. Results come back in input order.
+    """
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def one(case):
+        async with slots:
+            return await detective.aconclude(*case)
+
+    order = sorted(range(len(cases)), key=lambda i: detective.estimate_output_tokens(cases[i][4]))
+    results: List[str] = [""] * len(cases)
+    for i, text in zip(order, await asyncio.gather(*(one(cases[i]) for i in order))):
+        results[i] = text
+    return results
+
+
+def _game_client(model_name: str | None, seed: int | None, request_timeout: float | None = None) -> CachedLLMClient:
+    # Deterministic client: greedy decoding + optional seed (replays are served from cache)
+    return CachedLLMClient(
+        model_name=model_name,
+        temperature=0.0,
+        top_p=1.0,
+        max_tokens=500,
+        seed=seed,
+        request_timeout=request_timeout,
     )
 
-    # Validate/normalize the final accusation
-    final_name_norm = enforce_valid_final_name(llm, facts, final_report)
+
+def _settle(llm: LLMClient, facts: CaseFacts, final_report: str) -> Tuple[str, str]:
+    """Validated accusation (suspect's display name, or "") and the outcome, WIN or LOSE."""
+    accusation_re = LeadDetectiveAgent.compile_accusation_re(facts.suspects)
+    final_name_norm = enforce_valid_final_name(llm, facts, final_report, accusation_re)
     final_name_display = ""
     if final_name_norm:
         for s in facts.suspects:
             if s.lower() == final_name_norm:
                 final_name_display = s
                 break
+    return final_name_display, ("WIN" if final_name_norm == "butler" else "LOSE")
 
-    outcome = "WIN" if final_name_norm == "butler" else "LOSE"
+
+async def arun_game(
+    player_instruction: str,
+    rogue_role: str,
+    model_name: str | None = None,
+    rounds: int = 2,
+    difficulty: str = "medium",
+    seed: int | None = None,  # <-- NEW: deterministic seed for the whole run
+    classifier: InjectionClassifier | None = None,  # optional local screen for witness answers
+    constrained: bool = False,  # constrain the accusation to the suspects (structured output)
+    speculate: bool = False,  # draft the next question while the witness answers
+    fused: bool = False,  # reports + conclusion in one JSON call (FusedAnalyst); ignores `constrained`
+    summarize: bool = False,  # detective concludes from extracted testimony facts, not the raw text
+    request_timeout: float | None = None,  # per-LLM-call timeout in seconds (default: the pool's 60s)
+) -> Dict[str, str | List[Dict[str, str]]]:
+    """
+    Multi-round investigation (API-only), every model call on the caller's event loop.
+      1) Clue Master + Historian initial reports (one batched call)
+      2) Witness (player-influenced Rogue) initial testimony (concurrently with 1)
+      3) R rounds of Detective<->Witness Q/A
+      4) Detective conclusion (must be one of suspects)
+    Calls without an async variant (structured/fused conclusion, validator) run in a worker thread.
+    """
+    facts = default_case()
+    if difficulty in FIXED_OUTCOME:
+        player_instruction = sanitize(player_instruction)  # fold unicode tricks at ingestion
+    llm = _game_client(model_name, seed, request_timeout)
+
+    try:
+        # Agents
+        witness = RogueAgent(llm, role_name=rogue_role)  # presented as 'Witness' to the Detective
+        reporter = None if fused else ObjectiveReportsAgent(llm)  # Clue Master + Historian in one call
+        detective = LeadDetectiveAgent(llm, summarize=summarize)
+
+        # Conversation rounds
+        transcript = Transcript(classifier=classifier)
+        rounds = max(0, min(int(rounds), 6))  # bounds 0..6
+
+        # Initial reports & testimony (issued concurrently), then the Q/A rounds
+        # FIXED: respect the 'rounds' value
+        reports, witness_initial = await _investigate(
+            reporter, witness, detective, facts, transcript, player_instruction, rounds, speculate
+        )
+
+        # Final conclusion
+        if fused and detective.needs_model(facts, witness_initial, transcript, difficulty):
+            reports, final_report = await asyncio.to_thread(
+                FusedAnalyst(llm).analyze, facts, witness_initial, transcript, difficulty
+            )
+        else:
+            if reports is None:
+                # Fused mode, but the level's rules settle the verdict (fixed outcome, junk testimony):
+                # same canned conclusion as unfused, reports from the memoized Clue Master/Historian call
+                reports = await ObjectiveReportsAgent(llm).areport_both(facts)
+            if constrained:
+                final_report = await asyncio.to_thread(
+                    detective.conclude_constrained, facts, reports, witness_initial, transcript, difficulty
+                )
+            else:
+                final_report = await detective.aconclude(
+                    facts, reports, witness_initial, transcript, difficulty=difficulty
+                )
+
+        # Validate/normalize the final accusation
+        final_name_display, outcome = await asyncio.to_thread(_settle, llm, facts, final_report)
+    finally:
+        await llm.aclose()  # async pool is bound to this loop
+        llm.detach()  # drop this game's handle on the shared pool (connections stay warm)
 
     return {
         "rogue_role": rogue_role,
         "rogue_initial": witness_initial,
-        "transcript": transcript,
-        "clue_report": clue_report,
-        "history_report": history_report,
+        "transcript": transcript.rounds,
+        "clue_report": reports.get("Clue Master"),
+        "history_report": reports.get("Historian"),
         "final_report": final_report,
         "final_accusation": final_name_display,
         "outcome": outcome,
@@ -183,11 +383,106 @@ def run_game(
     }
 
 
+def run_game(
+    player_instruction: str,
+    rogue_role: str,
+    model_name: str | None = None,
+    rounds: int = 2,
+    difficulty: str = "medium",
+    seed: int | None = None,
+    classifier: InjectionClassifier | None = None,
+    constrained: bool = False,
+    speculate: bool = False,
+    fused: bool = False,
+    summarize: bool = False,
+    request_timeout: float | None = None,
+) -> Dict[str, str | List[Dict[str, str]]]:
+    """Blocking wrapper around `arun_game` (one event loop per game); same arguments."""
+    return asyncio.run(
+        arun_game(
+            player_instruction,
+            rogue_role,
+            model_name=model_name,
+            rounds=rounds,
+            difficulty=difficulty,
+            seed=seed,
+            classifier=classifier,
+            constrained=constrained,
+            speculate=speculate,
+            fused=fused,
+            summarize=summarize,
+            request_timeout=request_timeout,
+        )
+    )
+
+
+def run_game_streaming(
+    player_instruction: str,
+    rogue_role: str,
+    model_name: str | None = None,
+    rounds: int = 2,
+    difficulty: str = "medium",
+    seed: int | None = None,
+    request_timeout: float | None = None,
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    `run_game` for live UIs, as (stage, payload) pairs:
+      ("investigation", {...})  testimony, transcript and reports, once the rounds are done
+      ("conclusion", "chunk")   the detective's conclusion as it is generated
+      ("result", {...})         the full run_game result
+    """
+    facts = default_case()
+    if difficulty in FIXED_OUTCOME:
+        player_instruction = sanitize(player_instruction)  # fold unicode tricks at ingestion
+    llm = _game_client(model_name, seed, request_timeout)
+
+    try:
+        witness = RogueAgent(llm, role_name=rogue_role)
+        reporter = ObjectiveReportsAgent(llm)
+        detective = LeadDetectiveAgent(llm)
+        transcript = Transcript()
+        rounds = max(0, min(int(rounds), 6))
+
+        async def investigate():
+            try:
+                return await _investigate(reporter, witness, detective, facts, transcript, player_instruction, rounds)
+            finally:
+                await llm.aclose()  # async pool is bound to this loop
+
+        reports, witness_initial = asyncio.run(investigate())
+        result = {
+            "rogue_role": rogue_role,
+            "rogue_initial": witness_initial,
+            "transcript": transcript.rounds,
+            "clue_report": reports.get("Clue Master"),
+            "history_report": reports.get("Historian"),
+        }
+        yield "investigation", dict(result)
+
+        chunks = []
+        for chunk in detective.conclude_stream(facts, reports, witness_initial, transcript, difficulty):
+            chunks.append(chunk)
+            yield "conclusion", chunk
+        final_report = "".join(chunks).strip()
+
+        final_name_display, outcome = _settle(llm, facts, final_report)
+    finally:
+        llm.detach()
+
+    result.update(
+        final_report=final_report,
+        final_accusation=final_name_display,
+        outcome=outcome,
+        case_brief=render_case_brief(facts),
+    )
+    yield "result", result
+
+
 def render_case_brief(facts: CaseFacts) -> str:
     brief = (
         f"**Setting:** {facts.setting}\n\n"
         f"**Victim:** {facts.victim}\n\n"
-        f"**Suspects:** {', '.join(facts.suspects)}\n\n"
+        f"**Suspects:** {facts.suspects_csv}\n\n"
         "**Timeline**\n"
         + "\n".join(f"- {t}" for t in facts.timeline) + "\n\n"
         "**Known Clues**\n"
@@ -5,12 +5,11 @@ from appwrite.services.databases import Databases
 from appwrite.id import ID
 from appwrite.query import Query
 
+from config import BONUS_ALL_WINS, POINTS  # shared with the app
+
 # Load .env (uses the file named ".env" by default)
 load_dotenv()
 
-POINTS = {"level1": 20, "level2": 30, "level3": 50, "level4": 70, "level5": 100}
-BONUS_ALL_WINS = 100
-
 
 def get_env(name: str) -> str:
     value = os.getenv(name)
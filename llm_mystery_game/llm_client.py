@@ -1,12 +1,123 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
+import hashlib
+import json
 import os
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from dotenv import load_dotenv
 
 # Load variables from .env if present
 load_dotenv()
 
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+try:
+    import h2  # type: ignore  # noqa: F401
+    _HTTP2 = True
+except Exception:
+    _HTTP2 = False
+
+
+# Token usage of the most recent API call in the current thread/task (None on cache hits)
+_LAST_USAGE: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_last_usage", default=None)
+
+
+def _usage_dict(usage) -> Optional[Dict[str, int]]:
+    if not usage:
+        return None
+    get = usage.get if isinstance(usage, dict) else (lambda k: getattr(usage, k, None))
+    return {"prompt_tokens": get("prompt_tokens"), "completion_tokens": get("completion_tokens")}
+
+
+def _pooled_http_client():
+    """
+    Keep-alive httpx pool; see `_shared_http_client` for the process-wide instance.
+    """
+    try:
+        import httpx  # type: ignore
+    except Exception:
+        return None  # let the SDK build its default client
+    return httpx.Client(
+        http2=_HTTP2,
+        timeout=60.0,
+        # idle connections kept 60s (httpx default: 5s) so warm_up and bursty games reuse them
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0),
+    )
+
+
+_SHARED_HTTP = None
+_SHARED_HTTP_LOCK = threading.Lock()
+
+
+def _shared_http_client():
+    """
+    One sync pool for the whole process (httpx.Client is thread-safe): every agent of
+    every game, and concurrent app sessions, reuse its warm connections, so only the
+    first request pays the TCP/TLS handshake. Recreated if someone closed it.
+    """
+    global _SHARED_HTTP
+    with _SHARED_HTTP_LOCK:
+        if _SHARED_HTTP is None or _SHARED_HTTP.is_closed:
+            _SHARED_HTTP = _pooled_http_client()
+        return _SHARED_HTTP
+
+
+@atexit.register
+def shutdown() -> None:
+    """
+    Close the process-wide sync pool; runs at interpreter exit. Clients built before the
+    call can no longer send requests, new ones open a fresh pool.
+    """
+    global _SHARED_HTTP
+    with _SHARED_HTTP_LOCK:
+        http, _SHARED_HTTP = _SHARED_HTTP, None
+    if http is not None:
+        http.close()
+
+
+def _pooled_async_http_client():
+    """
+    Async counterpart of `_pooled_http_client` for `achat` / `astream_chat`.
+    Sized for gathered calls; with HTTP/2 they are multiplexed over one connection.
+    The pool is bound to the event loop that first uses it: see `LLMClient.aclose`.
+    """
+    try:
+        import httpx  # type: ignore
+    except Exception:
+        return None
+    return httpx.AsyncClient(
+        http2=_HTTP2,
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    )
+
+
+class _Inflight:
+    """Result slot shared by threads waiting on the same in-flight request."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncInflight:
+    """Shared API-call task plus the number of callers still awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
 
 class LLMClient:
     """
@@ -23,6 +134,7 @@ class LLMClient:
         top_p: float = 1.0,
         max_tokens: int = 500,
         seed: Optional[int] = None,
+        request_timeout: Optional[float] = None,
     ):
         self.model_name = model_name or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -30,6 +142,8 @@ class LLMClient:
         self.top_p = top_p
         self.max_tokens = max_tokens
         self.seed = seed
+        # Per-request timeout in seconds (None keeps the pool's 60s); bounds a hung call
+        self.request_timeout = request_timeout
 
         if not self.api_key:
             raise RuntimeError(
@@ -39,7 +153,8 @@ class LLMClient:
         # Try to import OpenAI SDK (new or legacy)
         try:
             from openai import OpenAI  # type: ignore
-            self._client = OpenAI(api_key=self.api_key)
+            self._http = _shared_http_client()
+            self._client = OpenAI(api_key=self.api_key, http_client=self._http, **self._timeout_kwargs())
             self._sdk = "new"
         except Exception:
             try:
@@ -52,25 +167,191 @@ class LLMClient:
                     "Failed to import OpenAI SDK. Install with `pip install openai`."
                 ) from e
 
-    def chat(
+        # Async client (and its pool) is created lazily on first `achat`
+        self._async_client = None
+        self._ahttp = None
+
+        # Requests currently on the wire, keyed by _request_key (see chat/achat)
+        self._inflight_lock = threading.Lock()
+        self._inflight_sync: Dict[str, _Inflight] = {}
+        self._inflight_async: Dict[str, _AsyncInflight] = {}
+
+    def _timeout_kwargs(self) -> Dict[str, float]:
+        return {} if self.request_timeout is None else {"timeout": self.request_timeout}
+
+    def warm_up(self) -> bool:
+        """
+        Open a keep-alive connection in the shared pool with one cheap request (models.retrieve),
+        so the first game call skips the TCP/TLS handshake. Best effort: False if it failed.
+        """
+        if self._sdk != "new":
+            return False
+        try:
+            self._client.models.retrieve(self.model_name)
+            return True
+        except Exception:
+            return False
+
+    def detach(self) -> None:
+        """
+        Drop this client's handle on the shared sync pool; its connections stay warm for
+        other clients. The pool itself is closed by `shutdown` (at interpreter exit).
+        """
+        self._http = None
+
+    async def aclose(self) -> None:
+        """
+        Release the async pool. Call it before the event loop that used `achat` ends
+        (e.g. at the end of the coroutine passed to asyncio.run); the next `achat`
+        then builds a fresh pool on whatever loop is running.
+        """
+        ahttp, self._ahttp, self._async_client = self._ahttp, None, None
+        if ahttp is not None:
+            await ahttp.aclose()
+
+    def __enter__(self) -> "LLMClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.detach()
+
+    @property
+    def last_usage(self) -> Optional[Dict[str, int]]:
+        """
+        Token usage of the latest API call made from the current thread/asyncio task;
+        None when that call was served without hitting the API.
+        """
+        return _LAST_USAGE.get()
+
+    @last_usage.setter
+    def last_usage(self, value: Optional[Dict[str, int]]) -> None:
+        _LAST_USAGE.set(value)
+
+    def _sampling(
+        self,
+        temperature: Optional[float],
+        top_p: Optional[float],
+        max_tokens: Optional[int],
+        seed: Optional[int],
+    ) -> Tuple[float, float, int, Optional[int]]:
+        """Per-call overrides falling back to the client defaults."""
+        return (
+            self.temperature if temperature is None else temperature,
+            self.top_p if top_p is None else top_p,
+            self.max_tokens if max_tokens is None else max_tokens,
+            self.seed if seed is None else seed,
+        )
+
+    @staticmethod
+    def _messages(system: Union[str, Sequence[str]], user: str) -> List[Dict[str, str]]:
+        """
+        One system message per part, so a constant leading part stays a
+        byte-identical prefix that the provider can cache across calls.
+        """
+        parts = [system] if isinstance(system, str) else list(system)
+        return [{"role": "system", "content": part} for part in parts] + [
+            {"role": "user", "content": user}
+        ]
+
+    def _request_key(
+        self,
+        system: Union[str, Sequence[str]],
+        user: str,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        seed: Optional[int] = None,
+        response_format: Optional[Dict] = None,
+    ) -> str:
+        """blake2b of everything that determines the reply (model, sampling params, output format, prompts)."""
+        params = self._sampling(temperature, top_p, max_tokens, seed)
+        parts = [system] if isinstance(system, str) else list(system)
+        fmt = json.dumps(response_format, sort_keys=True) if response_format else ""
+        raw = "\x00".join([self.model_name, repr(params), fmt, *parts, user])
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def chat(self, system: Union[str, Sequence[str]], user: str, **kwargs) -> str:
+        """
+        Blocking chat completion. Identical requests issued concurrently from
+        several threads share a single underlying API call.
+        """
+        key = self._request_key(system, user, **kwargs)
+        with self._inflight_lock:
+            slot = self._inflight_sync.get(key)
+            leader = slot is None
+            if leader:
+                slot = self._inflight_sync[key] = _Inflight()
+
+        if not leader:
+            slot.done.wait()
+            if slot.error is not None:
+                raise slot.error
+            return slot.result
+
+        try:
+            slot.result = self._chat_once(system, user, **kwargs)
+            return slot.result
+        except BaseException as e:
+            slot.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight_sync.pop(key, None)
+            slot.done.set()
+
+    async def achat(self, system: Union[str, Sequence[str]], user: str, **kwargs) -> str:
+        """
+        Async mirror of `chat`, so independent agent calls can run concurrently
+        (e.g. with asyncio.gather). Identical requests already in flight are
+        awaited instead of being sent again.
+        The API call runs as its own task and every caller awaits it through
+        asyncio.shield: cancelling one caller (even the one that started it) leaves
+        the call running for the others; once the last caller is gone it is cancelled.
+        """
+        key = self._request_key(system, user, **kwargs)
+        slot = self._inflight_async.get(key)
+        leader = slot is None or slot.waiters == 0  # no waiters left: that call is being cancelled
+        if leader:
+            slot = _AsyncInflight(asyncio.ensure_future(self._achat_with_usage(system, user, **kwargs)))
+            self._inflight_async[key] = slot
+            slot.task.add_done_callback(functools.partial(self._inflight_async_done, key, slot))
+        slot.waiters += 1
+        try:
+            text, usage = await asyncio.shield(slot.task)
+        finally:
+            slot.waiters -= 1
+            if slot.waiters == 0 and not slot.task.done():
+                slot.task.cancel()  # every caller gave up: abort the request
+        if leader:
+            _LAST_USAGE.set(usage)  # the task ran in a copy of our context
+        return text
+
+    async def _achat_with_usage(self, system: Union[str, Sequence[str]], user: str, **kwargs):
+        text = await self._achat_once(system, user, **kwargs)
+        return text, _LAST_USAGE.get()
+
+    def _inflight_async_done(self, key: str, slot: _AsyncInflight, task: asyncio.Future) -> None:
+        if self._inflight_async.get(key) is slot:
+            del self._inflight_async[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller was cancelled
+
+    def _chat_once(
         self,
-        system: str,
+        system: Union[str, Sequence[str]],
         user: str,
         *,
         temperature: Optional[float] = None,
         top_p: Optional[float] = None,
         max_tokens: Optional[int] = None,
         seed: Optional[int] = None,
+        response_format: Optional[Dict] = None,
     ) -> str:
-        t = self.temperature if temperature is None else temperature
-        p = self.top_p if top_p is None else top_p
-        m = self.max_tokens if max_tokens is None else max_tokens
-        s = self.seed if seed is None else seed
-
-        messages = [
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ]
+        t, p, m, s = self._sampling(temperature, top_p, max_tokens, seed)
+
+        messages = self._messages(system, user)
+        # Structured output (e.g. a json_schema constraining a field to an enum) only when asked
+        fmt = {"response_format": response_format} if response_format else {}
 
         if self._sdk == "new":
             # OpenAI Python SDK v1+
@@ -82,7 +363,9 @@ class LLMClient:
                 max_tokens=m,
                 seed=s,  # determinism (supported by gpt-4o, gpt-4o-mini)
                 n=1,
+                **fmt,
             )
+            _LAST_USAGE.set(_usage_dict(resp.usage))
             return (resp.choices[0].message.content or "").strip()
 
         # Legacy SDK
@@ -97,5 +380,402 @@ class LLMClient:
             max_tokens=m,
             n=1,
             **kwargs,
+            **fmt,
         )
+        _LAST_USAGE.set(_usage_dict(resp.get("usage")))
         return (resp["choices"][0]["message"]["content"] or "").strip()
+
+    def stream_chat(
+        self,
+        system: Union[str, Sequence[str]],
+        user: str,
+        *,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        seed: Optional[int] = None,
+        complete_when: Optional[Callable[[str], object]] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming variant of `chat`: yields text chunks as they arrive.
+        Closing the generator early closes the underlying HTTP response.
+        `complete_when` is only used by CachedLLMClient (see there); ignored here.
+        """
+        t, p, m, s = self._sampling(temperature, top_p, max_tokens, seed)
+        messages = self._messages(system, user)
+
+        if self._sdk == "new":
+            stream = self._client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=t,
+                top_p=p,
+                max_tokens=m,
+                seed=s,
+                n=1,
+                stream=True,
+                stream_options={"include_usage": True},  # usage arrives on the last chunk
+            )
+            try:
+                for chunk in stream:
+                    if chunk.usage:
+                        _LAST_USAGE.set(_usage_dict(chunk.usage))
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+            return
+
+        # Legacy SDK
+        kwargs = {}
+        if s is not None:
+            kwargs["seed"] = s
+        stream = self._client.ChatCompletion.create(  # type: ignore[attr-defined]
+            model=self.model_name,
+            messages=messages,
+            temperature=t,
+            top_p=p,
+            max_tokens=m,
+            n=1,
+            stream=True,
+            **kwargs,
+        )
+        for chunk in stream:
+            content = chunk["choices"][0].get("delta", {}).get("content")
+            if content:
+                yield content
+
+    async def _achat_once(
+        self,
+        system: Union[str, Sequence[str]],
+        user: str,
+        *,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        seed: Optional[int] = None,
+        response_format: Optional[Dict] = None,
+    ) -> str:
+        if self._sdk != "new":
+            # Legacy SDK has no async client: run the blocking call in a worker thread
+            return await asyncio.to_thread(
+                self._chat_once,
+                system,
+                user,
+                temperature=temperature,
+                top_p=top_p,
+                max_tokens=max_tokens,
+                seed=seed,
+                response_format=response_format,
+            )
+
+        t, p, m, s = self._sampling(temperature, top_p, max_tokens, seed)
+        fmt = {"response_format": response_format} if response_format else {}
+
+        resp = await self._aclient().chat.completions.create(
+            model=self.model_name,
+            messages=self._messages(system, user),
+            temperature=t,
+            top_p=p,
+            max_tokens=m,
+            seed=s,
+            n=1,
+            **fmt,
+        )
+        _LAST_USAGE.set(_usage_dict(resp.usage))
+        return (resp.choices[0].message.content or "").strip()
+
+    def _aclient(self):
+        if self._async_client is None:
+            from openai import AsyncOpenAI  # type: ignore
+            self._ahttp = _pooled_async_http_client()
+            self._async_client = AsyncOpenAI(api_key=self.api_key, http_client=self._ahttp, **self._timeout_kwargs())
+        return self._async_client
+
+    async def astream_chat(
+        self,
+        system: Union[str, Sequence[str]],
+        user: str,
+        *,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        seed: Optional[int] = None,
+        complete_when: Optional[Callable[[str], object]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Async mirror of `stream_chat`. Closing the generator early (`aclose()`, or
+        breaking out of `async for`) closes the underlying HTTP response.
+        """
+        if self._sdk != "new":
+            # Legacy SDK has no async client: fetch the whole reply in a worker thread
+            yield await asyncio.to_thread(
+                self._chat_once,
+                system,
+                user,
+                temperature=temperature,
+                top_p=top_p,
+                max_tokens=max_tokens,
+                seed=seed,
+            )
+            return
+
+        t, p, m, s = self._sampling(temperature, top_p, max_tokens, seed)
+        stream = await self._aclient().chat.completions.create(
+            model=self.model_name,
+            messages=self._messages(system, user),
+            temperature=t,
+            top_p=p,
+            max_tokens=m,
+            seed=s,
+            n=1,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        try:
+            async for chunk in stream:
+                if chunk.usage:
+                    _LAST_USAGE.set(_usage_dict(chunk.usage))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                await close()
+
+    # ====== Batch API (offline evaluation) ======
+
+    def submit_batch(self, requests: Sequence[Tuple[Union[str, Sequence[str]], str]]) -> str:
+        """
+        Upload (system, user) pairs as one Batch API job (OpenAI SDK v1+ only).
+        Returns the batch id; use `collect_batch` to wait for the outputs.
+        """
+        if self._sdk != "new":
+            raise RuntimeError("The Batch API requires the OpenAI SDK v1+.")
+
+        t, p, m, s = self._sampling(None, None, None, None)
+        lines = []
+        for i, (system, user) in enumerate(requests):
+            body = {
+                "model": self.model_name,
+                "messages": self._messages(system, user),
+                "temperature": t,
+                "top_p": p,
+                "max_tokens": m,
+                "n": 1,
+            }
+            if s is not None:
+                body["seed"] = s
+            lines.append(json.dumps({
+                "custom_id": f"req-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body,
+            }))
+
+        upload = self._client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = self._client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def collect_batch(
+        self,
+        batch_id: str,
+        *,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Poll a batch until it finishes and return the replies in submission order.
+        Requests that errored inside the batch come back as "".
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            batch = self._client.batches.retrieve(batch_id)
+            if batch.status in ("completed", "failed", "expired", "cancelled"):
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch_id} still '{batch.status}' after {timeout}s")
+            time.sleep(poll_interval)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+
+        replies: Dict[int, str] = {}
+        for line in self._client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = (record.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            if choices:
+                idx = int(record["custom_id"].rsplit("-", 1)[1])
+                replies[idx] = (choices[0]["message"]["content"] or "").strip()
+
+        total = batch.request_counts.total if batch.request_counts else len(replies)
+        return [replies.get(i, "") for i in range(total)]
+
+
+# ====== Response cache ======
+
+# In-process LRU shared by every CachedLLMClient (keys include model + sampling params)
+_MEMORY_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_MEMORY_CACHE_SIZE = 1024
+_MEMORY_LOCK = threading.Lock()
+
+
+class CachedLLMClient(LLMClient):
+    """
+    Drop-in LLMClient that memoizes replies keyed on a blake2b hash of the request
+    (model, sampling params, system, user).
+    Replies are kept in an in-process LRU; set `cache_dir` (or LLM_CACHE_DIR) to also
+    persist them with `diskcache`, if installed.
+    Only greedy calls (temperature 0) are cached: sampled replies are meant to vary.
+    Pass `bypass_cache=True` to force a fresh call.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        *,
+        cache_dir: Optional[str] = None,
+        **kwargs,
+    ):
+        super().__init__(model_name, **kwargs)
+
+        self._disk = None
+        cache_dir = cache_dir or os.getenv("LLM_CACHE_DIR")
+        if cache_dir:
+            try:
+                import diskcache  # type: ignore
+                self._disk = diskcache.Cache(cache_dir)
+            except Exception:
+                self._disk = None  # optional dependency: fall back to memory only
+
+    def _cacheable(self, temperature: Optional[float]) -> bool:
+        return (self.temperature if temperature is None else temperature) == 0
+
+    def _lookup(self, key: str) -> Optional[str]:
+        with _MEMORY_LOCK:
+            if key in _MEMORY_CACHE:
+                _MEMORY_CACHE.move_to_end(key)
+                return _MEMORY_CACHE[key]
+        if self._disk is not None:
+            hit = self._disk.get(key)
+            if hit is not None:
+                self._remember(key, hit)
+                return hit
+        return None
+
+    def _remember(self, key: str, value: str) -> None:
+        with _MEMORY_LOCK:
+            _MEMORY_CACHE[key] = value
+            _MEMORY_CACHE.move_to_end(key)
+            while len(_MEMORY_CACHE) > _MEMORY_CACHE_SIZE:
+                _MEMORY_CACHE.popitem(last=False)
+
+    def _store(self, key: str, value: str) -> None:
+        self._remember(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value)
+
+    def chat(self, system: Union[str, Sequence[str]], user: str, *, bypass_cache: bool = False, **kwargs) -> str:
+        if bypass_cache or not self._cacheable(kwargs.get("temperature")):
+            return super().chat(system, user, **kwargs)
+        key = self._request_key(system, user, **kwargs)
+        hit = self._lookup(key)
+        if hit is not None:
+            return hit
+        out = super().chat(system, user, **kwargs)
+        self._store(key, out)
+        return out
+
+    async def achat(self, system: Union[str, Sequence[str]], user: str, *, bypass_cache: bool = False, **kwargs) -> str:
+        if bypass_cache or not self._cacheable(kwargs.get("temperature")):
+            return await super().achat(system, user, **kwargs)
+        key = self._request_key(system, user, **kwargs)
+        hit = self._lookup(key)
+        if hit is not None:
+            return hit
+        out = await super().achat(system, user, **kwargs)
+        self._store(key, out)
+        return out
+
+    def _store_stream(self, key: str, parts: List[str], finished: bool, complete_when) -> None:
+        """
+        Cache a streamed reply under the `chat` key. A stream that was cut short (closed by
+        the consumer, an error, a timeout, cancellation) is cached only when `complete_when`
+        confirms the text so far is a full answer: a partial reply must never be replayed.
+        """
+        text = "".join(parts)
+        if finished or (complete_when is not None and complete_when(text)):
+            self._store(key, text.strip())
+
+    def stream_chat(
+        self,
+        system: Union[str, Sequence[str]],
+        user: str,
+        *,
+        bypass_cache: bool = False,
+        complete_when: Optional[Callable[[str], object]] = None,
+        **kwargs,
+    ) -> Iterator[str]:
+        """
+        Cache hits are replayed as a single chunk. On a miss, the reply is stored once the
+        stream ends; if the consumer stops early, only when `complete_when(text)` is truthy
+        (e.g. the detective's final line has arrived).
+        """
+        if bypass_cache or not self._cacheable(kwargs.get("temperature")):
+            yield from super().stream_chat(system, user, **kwargs)
+            return
+        key = self._request_key(system, user, **kwargs)
+        hit = self._lookup(key)
+        if hit is not None:
+            yield hit
+            return
+        parts: List[str] = []
+        finished = False
+        try:
+            for chunk in super().stream_chat(system, user, **kwargs):
+                parts.append(chunk)
+                yield chunk
+            finished = True
+        finally:
+            self._store_stream(key, parts, finished, complete_when)
+
+    async def astream_chat(
+        self,
+        system: Union[str, Sequence[str]],
+        user: str,
+        *,
+        bypass_cache: bool = False,
+        complete_when: Optional[Callable[[str], object]] = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """Async mirror of `stream_chat`, with the same caching behaviour."""
+        if bypass_cache or not self._cacheable(kwargs.get("temperature")):
+            async for chunk in super().astream_chat(system, user, **kwargs):
+                yield chunk
+            return
+        key = self._request_key(system, user, **kwargs)
+        hit = self._lookup(key)
+        if hit is not None:
+            yield hit
+            return
+        parts: List[str] = []
+        finished = False
+        try:
+            async for chunk in super().astream_chat(system, user, **kwargs):
+                parts.append(chunk)
+                yield chunk
+            finished = True
+        finally:
+            self._store_stream(key, parts, finished, complete_when)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class Metrics:
+    """
+    In-process log of per-agent-call timings.
+    Each call produces one 'agent_end' event with latency and token usage.
+    """
+
+    def __init__(self):
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        agent: str,
+        method: str,
+        latency_ms: float,
+        usage: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, Any]:
+        event = {
+            "type": "agent_end",
+            "agent": agent,
+            "method": method,
+            "latencyMs": round(latency_ms, 1),
+            "promptTokens": usage.get("prompt_tokens") if usage else None,
+            "completionTokens": usage.get("completion_tokens") if usage else None,
+        }
+        with self._lock:
+            self._events.append(event)
+        return event
+
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Totals per agent: calls, latencyMs, promptTokens, completionTokens."""
+        out: Dict[str, Dict[str, float]] = {}
+        for e in self.events():
+            row = out.setdefault(
+                e["agent"], {"calls": 0, "latencyMs": 0.0, "promptTokens": 0, "completionTokens": 0}
+            )
+            row["calls"] += 1
+            row["latencyMs"] += e["latencyMs"]
+            row["promptTokens"] += e["promptTokens"] or 0
+            row["completionTokens"] += e["completionTokens"] or 0
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+
+
+METRICS = Metrics()
+
+
+def timed(fn):
+    """
+    Record latency + token usage of an agent method (sync, async or async-generator) into METRICS.
+    Expects the agent to expose `self.llm` (an LLMClient).
+    """
+
+    def _finish(self, t0: float) -> None:
+        self._last_latency_ms = (time.perf_counter() - t0) * 1000
+        METRICS.record(
+            type(self).__name__,
+            fn.__name__,
+            self._last_latency_ms,
+            getattr(self.llm, "last_usage", None),
+        )
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(self, *args, **kwargs):
+            self.llm.last_usage = None
+            t0 = time.perf_counter()
+            try:
+                return await fn(self, *args, **kwargs)
+            finally:
+                _finish(self, t0)
+
+        return async_wrapper
+
+    if inspect.isasyncgenfunction(fn):
+        # Streaming methods: the call ends when the consumer finishes or closes the stream
+        @functools.wraps(fn)
+        async def agen_wrapper(self, *args, **kwargs):
+            self.llm.last_usage = None
+            t0 = time.perf_counter()
+            gen = fn(self, *args, **kwargs)
+            try:
+                async for item in gen:
+                    yield item
+            finally:
+                await gen.aclose()
+                _finish(self, t0)
+
+        return agen_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        self.llm.last_usage = None
+        t0 = time.perf_counter()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            _finish(self, t0)
+
+    return wrapper
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+from typing import Callable, List
+
+import pytest
+
+# The game modules use flat imports (`from llm_client import ...`), as when run via Streamlit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "llm_mystery_game"))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")  # never used: StubClient answers every call
+os.environ.pop("LLM_CACHE_DIR", None)  # memory cache only
+
+import agents  # noqa: E402
+import llm_client  # noqa: E402
+from llm_client import CachedLLMClient, LLMClient  # noqa: E402
+
+
+def _joined(system) -> str:
+    return system if isinstance(system, str) else "\n".join(system)
+
+
+class _StubTransport(LLMClient):
+    """
+    Replaces the four methods that reach the API. `respond(system, user)` gives the reply
+    text; `delay(system, user)` how long an async call takes. Calls are recorded in
+    `started` / `finished` / `cancelled` (the user prompts).
+    """
+
+    def __init__(
+        self,
+        model_name=None,
+        *,
+        respond: Callable[[str, str], str],
+        delay: Callable[[str, str], float] = lambda s, u: 0.0,
+        chunk: int = 8,
+        **kwargs,
+    ):
+        super().__init__(model_name, **kwargs)
+        self.respond, self.delay, self.chunk = respond, delay, chunk
+        self.started: List[str] = []
+        self.finished: List[str] = []
+        self.cancelled: List[str] = []
+
+    def _chat_once(self, system, user, **kwargs) -> str:
+        self.started.append(user)
+        out = self.respond(_joined(system), user)
+        self.finished.append(user)
+        return out
+
+    async def _achat_once(self, system, user, **kwargs) -> str:
+        self.started.append(user)
+        try:
+            await asyncio.sleep(self.delay(_joined(system), user))
+        except asyncio.CancelledError:
+            self.cancelled.append(user)
+            raise
+        out = self.respond(_joined(system), user)
+        self.finished.append(user)
+        return out
+
+    def stream_chat(self, system, user, *, complete_when=None, **kwargs):
+        self.started.append(user)
+        text = self.respond(_joined(system), user)
+        for i in range(0, len(text), self.chunk):
+            yield text[i: i + self.chunk]
+        self.finished.append(user)
+
+    async def astream_chat(self, system, user, *, complete_when=None, **kwargs):
+        for chunk in self.stream_chat(system, user):
+            yield chunk
+
+
+class StubClient(CachedLLMClient, _StubTransport):
+    """CachedLLMClient (caching, coalescing) on top of the stub transport."""
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    # Replies and reports are memoized process-wide; every test starts cold
+    llm_client._MEMORY_CACHE.clear()
+    agents._REPORT_MEMO.clear()
+    yield
+    llm_client._MEMORY_CACHE.clear()
+    agents._REPORT_MEMO.clear()
+
+
+@pytest.fixture
+def stub() -> Callable[..., StubClient]:
+    return StubClient
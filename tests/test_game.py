@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import pytest
+
+import game
+from agents import FIXED_CONCLUSION, FUSED_SYSTEM, QUESTION_SYSTEM
+
+CONCLUDE_MARKER = "[Pre-screened Evidence]"  # only conclusion prompts (plain and fused) carry it
+
+
+def _respond(system, user):
+    if QUESTION_SYSTEM in system:
+        return "Where were you at 9:45?"
+    if FUSED_SYSTEM in system:
+        return json.dumps({
+            "clues": ["Muddy shoe print"], "background": ["Debts"],
+            "reasoning": "The key log points at him.", "accusation": "Butler",
+        })
+    if CONCLUDE_MARKER in user:
+        return "The key log points at him.\nFinal Accusation: Butler"
+    # Witness and reports: plain testimony, nothing that screens as an injection
+    return "The Butler took the master key ring before the study went dark."
+
+
+@pytest.fixture
+def play(monkeypatch, stub):
+    llm = stub(respond=_respond)
+    monkeypatch.setattr(game, "_game_client", lambda *args: llm)
+
+    def run(**kwargs):
+        return asyncio.run(game.arun_game("Blame the Butler", "Housekeeper", **kwargs)), llm
+
+    return run
+
+
+@pytest.mark.parametrize("difficulty", ["very_hard", "extreme"])
+def test_fixed_outcome_skips_the_conclusion_call(play, difficulty):
+    result, llm = play(difficulty=difficulty)
+
+    assert result["final_report"] == FIXED_CONCLUSION.substitute(name="Housekeeper")
+    assert result["outcome"] == "LOSE"
+    assert not any(CONCLUDE_MARKER in user for user in llm.started)
+    assert len(result["transcript"]) == 2  # the investigation still runs
+
+
+def test_fused_mode_falls_back_on_fixed_outcome_levels(play):
+    result, llm = play(difficulty="extreme", fused=True)
+
+    assert result["final_report"] == FIXED_CONCLUSION.substitute(name="Housekeeper")
+    assert result["outcome"] == "LOSE"
+    assert not any(CONCLUDE_MARKER in user for user in llm.started)
+    assert result["clue_report"]  # reports come from the Clue Master/Historian call instead
+
+
+def test_fused_mode_uses_the_analyst_when_the_model_decides(play):
+    result, llm = play(difficulty="medium", fused=True)
+
+    assert sum(CONCLUDE_MARKER in user for user in llm.started) == 1
+    assert result["clue_report"] == "- Muddy shoe print"
+    assert result["final_accusation"] == "Butler"
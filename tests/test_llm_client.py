@@ -0,0 +1,90 @@
+import asyncio
+
+import llm_client
+
+
+def _slow(stub, seconds=0.1):
+    return stub(respond=lambda system, user: "The Butler was in the pantry.", delay=lambda s, u: seconds)
+
+
+def test_cancelled_leader_leaves_the_call_to_followers(stub):
+    llm = _slow(stub)
+
+    async def run():
+        leader = asyncio.ensure_future(llm.achat("sys", "where?"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(llm.achat("sys", "where?"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "The Butler was in the pantry."
+    assert len(llm.started) == 1 and len(llm.finished) == 1 and not llm.cancelled
+
+
+def test_call_is_aborted_once_every_caller_is_cancelled(stub):
+    llm = _slow(stub)
+
+    async def run():
+        callers = [asyncio.ensure_future(llm.achat("sys", "where?")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)  # let the shared task observe its cancellation
+        # checked before asyncio.run cancels whatever is left over
+        assert len(llm.started) == 1 and len(llm.cancelled) == 1 and not llm.finished
+
+    asyncio.run(run())
+    assert llm._lookup(llm._request_key("sys", "where?")) is None
+    assert not llm._inflight_async
+
+
+def test_cancelled_call_is_sent_again_by_a_new_caller(stub):
+    llm = _slow(stub, seconds=0.05)
+
+    async def run():
+        first = asyncio.ensure_future(llm.achat("sys", "where?"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0)  # the aborted task may still be registered
+        return await llm.achat("sys", "where?")
+
+    assert asyncio.run(run()) == "The Butler was in the pantry."
+    assert len(llm.started) == 2 and len(llm.cancelled) == 1
+
+
+def test_partial_stream_is_not_cached(stub):
+    llm = stub(respond=lambda system, user: "Reasoning.\nFinal Accusation: Chef", chunk=4)
+    key = llm._request_key("sys", "conclude")
+
+    stream = llm.stream_chat("sys", "conclude")
+    next(stream)
+    stream.close()
+    assert llm._lookup(key) is None
+
+    assert "".join(llm.stream_chat("sys", "conclude")) == "Reasoning.\nFinal Accusation: Chef"
+    assert llm._lookup(key) == "Reasoning.\nFinal Accusation: Chef"
+
+
+def test_stream_cut_after_a_complete_answer_is_cached(stub):
+    llm = stub(respond=lambda system, user: "Final Accusation: Chef\ntrailing", chunk=23)
+    key = llm._request_key("sys", "conclude")
+
+    stream = llm.stream_chat("sys", "conclude", complete_when=lambda text: "\n" in text)
+    next(stream)
+    stream.close()
+    assert llm._lookup(key) == "Final Accusation: Chef"
+
+
+def test_partial_async_stream_is_not_cached(stub):
+    llm = stub(respond=lambda system, user: "Reasoning.\nFinal Accusation: Chef", chunk=4)
+
+    async def run():
+        stream = llm.astream_chat("sys", "conclude")
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(run())
+    assert llm._lookup(llm._request_key("sys", "conclude")) is None
+    assert not llm_client._MEMORY_CACHE
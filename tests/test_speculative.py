@@ -0,0 +1,42 @@
+import asyncio
+import itertools
+
+from agents import QUESTION_SYSTEM, LeadDetectiveAgent, RogueAgent, Transcript
+from game import _interview_speculative, default_case
+
+
+def test_discarded_draft_aborts_its_request(stub):
+    answers = iter([
+        "I was polishing silver in the pantry all evening.",
+        "Honestly the conservatory door slammed twice before ten and someone ran past.",
+        "Nothing else comes to mind.",
+    ])
+    asked = itertools.count(1)
+
+    def respond(system, user):
+        if QUESTION_SYSTEM in system:
+            return f"Question {next(asked)}: where were you at 9:45?"  # distinct, so answers are not cache hits
+        return next(answers)
+
+    def delay(system, user):
+        return 0.3 if QUESTION_SYSTEM in system else 0.02  # drafts still in flight when the answer lands
+
+    llm = stub(respond=respond, delay=delay)
+    transcript = Transcript()
+
+    async def run():
+        try:
+            await _interview_speculative(
+                LeadDetectiveAgent(llm), RogueAgent(llm, role_name="Housekeeper"),
+                default_case(), transcript, "Say something", rounds=3,
+            )
+            await asyncio.sleep(0.4)  # give a leaked draft time to finish if it was not aborted
+        finally:
+            await llm.aclose()
+
+    asyncio.run(run())
+
+    assert len(transcript.rounds) == 3
+    # The round-2 answer differs from round 1, so the draft is discarded and its call aborted
+    assert len(llm.cancelled) == 1
+    assert len(llm.started) == len(llm.finished) + len(llm.cancelled)